@@ -4,31 +4,250 @@ from tkinter import messagebox, scrolledtext, ttk
 import sqlite3
 import os
 import re
+import csv
+import json
 import datetime
 import logging
+import logging.handlers
+import queue
+import threading
+import argparse
+import itertools
+import multiprocessing
+import multiprocessing.util
+import time
+import uuid
+import random
+import shutil
+import tempfile
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+
+# --- Logging assíncrono (erros e auditoria) ---
+AUDIT_LOGGER_NAME = "mahnrattan.audit"
+audit_logger = logging.getLogger(AUDIT_LOGGER_NAME)
+
+
+class RepeatedMessageFilter(logging.Filter):
+    """Deixa passar uma ocorrência de cada aviso/erro idêntico a cada 'window_s' segundos.
+
+    A primeira ocorrência liberada depois da janela informa quantas foram suprimidas.
+    """
+    def __init__(self, window_s=60.0, max_keys=1000):
+        super().__init__()
+        self.window_s = window_s
+        self.max_keys = max_keys
+        self._seen = {} #(nível, mensagem) -> [último registro emitido, ocorrências suprimidas]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            return True
+        message = record.getMessage()
+        key = (record.levelno, message)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry and now - entry[0] < self.window_s:
+                entry[1] += 1
+                return False
+            suppressed = entry[1] if entry else 0
+            if len(self._seen) >= self.max_keys: #descarta as mensagens mais antigas
+                for old_key in sorted(self._seen, key=lambda k: self._seen[k][0])[:self.max_keys // 2]:
+                    del self._seen[old_key]
+            self._seen[key] = [now, 0]
+        if suppressed:
+            record.msg = f"{message} (repetida mais {suppressed} vez(es) nos últimos {self.window_s:.0f}s)"
+            record.args = None
+        return True
+
+
+class AuditJsonFormatter(logging.Formatter):
+    """Formata cada evento de auditoria como uma linha JSON."""
+    def format(self, record):
+        event = {"ts": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+                 "event": record.getMessage()}
+        event.update(getattr(record, "audit", {}))
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+def audit_event(event, **fields):
+    """Registra um evento no log de auditoria (JSON). Não bloqueia: só enfileira o registro."""
+    audit_logger.info(event, extra={"audit": fields})
+
+
+def setup_logging(error_log="app_errors.log", audit_log="audit_log.jsonl", debug=False,
+                  max_bytes=5 * 1024 * 1024, backup_count=5):
+    """Configura o logging em fila: quem registra apenas enfileira, e uma thread grava os arquivos.
+
+    Erros vão para 'error_log' (com limitação de mensagens repetidas) e os eventos de
+    auditoria para 'audit_log', ambos com rotação por tamanho. Com 'debug', as mensagens
+    de depuração também aparecem no console. Retorna o QueueListener, parado ao sair.
+    """
+    log_queue = queue.Queue(-1) #sem limite: put nunca bloqueia o banco nem a thread do Tk
+
+    error_handler = logging.handlers.RotatingFileHandler(error_log, maxBytes=max_bytes, backupCount=backup_count,
+                                                         encoding="utf-8", delay=True)
+    error_handler.setLevel(logging.ERROR)
+    error_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    error_handler.addFilter(lambda record: record.name != AUDIT_LOGGER_NAME)
+
+    audit_handler = logging.handlers.RotatingFileHandler(audit_log, maxBytes=max_bytes, backupCount=backup_count,
+                                                         encoding="utf-8", delay=True)
+    audit_handler.setFormatter(AuditJsonFormatter())
+    audit_handler.addFilter(logging.Filter(AUDIT_LOGGER_NAME))
+
+    handlers = [error_handler, audit_handler]
+    if debug:
+        console_handler = logging.StreamHandler()
+        console_handler.setLevel(logging.DEBUG)
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        console_handler.addFilter(lambda record: record.name != AUDIT_LOGGER_NAME)
+        handlers.append(console_handler)
+
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(RepeatedMessageFilter())
+    root_logger = logging.getLogger()
+    root_logger.handlers = [queue_handler]
+    root_logger.setLevel(logging.DEBUG if debug else logging.ERROR)
+
+    audit_logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    audit_logger.setLevel(logging.INFO)
+    audit_logger.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop) #grava o que ainda estiver na fila
+    return listener
+
+#Minúsculas apenas em ASCII, como faz a collation NOCASE do SQLite
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+#Políticas de conflito aceitas por upsert_record/upsert_records
+UPSERT_POLICIES = ("newest", "overwrite", "skip")
+
+#Campos de um ticket replicados pelo registro de alterações (a chave entre bancos é 'name')
+CHANGE_FIELDS = ("name", "type", "date", "status")
+
+#Tabela de tickets usada pelo painel e pelos comandos de linha de comando
+TICKETS_TABLE = "tickets"
+TICKETS_COLUMNS = {
+    "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
+    "name": "TEXT NOT NULL UNIQUE",
+    "type": "TEXT",
+    "date": "TEXT",
+    "status": "TEXT"
+}
+
+_BR_DATE_RE = re.compile(r"^(\d{2})/(\d{2})/(\d{4})$")
+_ISO_DATE_RE = re.compile(r"^(\d{4})-(\d{2})-(\d{2})")
+
+
+def _parse_ticket_date(date_string):
+    """Converte 'dd/mm/aaaa' em datetime.date; retorna None se a data não for real.
+
+    Equivale a datetime.strptime(date_string, "%d/%m/%Y"), mas bem mais rápido, o que
+    importa na importação de arquivos grandes.
+    """
+    match = _BR_DATE_RE.match(date_string)
+    if not match:
+        return None
+    day, month, year = match.groups()
+    try:
+        return datetime.date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+# --- Erros do banco de dados ---
+class DatabaseError(Exception):
+    """Erro do banco de dados nos comandos de linha de comando, onde não há caixa de diálogo."""
+
+
+def _show_error_dialog(title, message):
+    messagebox.showerror(title, message)
 
 
-# Configuração básica de logging
-logging.basicConfig(filename='app_errors.log', level=logging.ERROR,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
+def _raise_database_error(title, message):
+    raise DatabaseError(message)
+
+
+#Como os erros do banco chegam ao usuário: caixa de diálogo no painel; main() troca por
+#_raise_database_error nos comandos de linha de comando, que podem rodar sem tela
+db_error_handler = _show_error_dialog
+
+
+def show_db_error(title, message):
+    """Informa um erro do banco (já registrado no log por quem chama) pelo db_error_handler atual."""
+    db_error_handler(title, message)
 
 
 # --- SQLiteDatabase Class ---
 class SQLiteDatabase:
-    def __init__(self, db_name="records_gui.db"):
+    def __init__(self, db_name="records_gui.db", timeout=5.0, journal_mode=None):
         self.db_name = db_name
+        self.timeout = timeout #tempo máximo de espera por um lock, em segundos
+        self.journal_mode = journal_mode
         self.conn = None
         self.cursor = None
+        #contadores de disputa por lock desta conexão
+        self.lock_stats = {"busy_retries": 0, "lock_wait_s": 0.0, "locked_errors": 0}
         self.connect()
 
     def connect(self):
         """Estabelece uma conexão com o banco de dados SQLite."""
         try:
-            self.conn = sqlite3.connect(self.db_name)
+            #timeout=0 desliga a espera interna do SQLite: _retry_when_locked espera no lugar dele,
+            #assim todo o tempo bloqueado é medido. Transações começam com BEGIN IMMEDIATE para
+            #que um comando recusado por lock possa ser repetido sem deixar meia transação aberta.
+            self.conn = sqlite3.connect(self.db_name, timeout=0, isolation_level="IMMEDIATE")
             self.cursor = self.conn.cursor()
+            if self.journal_mode:
+                self._execute(f"PRAGMA journal_mode = {self.journal_mode}")
         except sqlite3.Error as e:
             logging.error(f"Erro ao conectar ao banco de dados: {e}")
-            messagebox.showerror("Erro no Banco de Dados", f"Erro ao conectar ao banco de dados: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao conectar ao banco de dados: {e}")
+
+    def _retry_when_locked(self, operation):
+        """Executa 'operation', tentando de novo com espera crescente enquanto o banco estiver bloqueado.
+
+        As novas tentativas duram no máximo 'timeout' segundos; depois disso o erro é repassado.
+        Todo o tempo entre a primeira tentativa recusada e o fim da espera é somado em
+        lock_stats['lock_wait_s'].
+        """
+        attempt = 0
+        blocked_since = None
+        while True:
+            try:
+                result = operation()
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) and "busy" not in str(e):
+                    raise
+                now = time.perf_counter()
+                if blocked_since is None:
+                    blocked_since = now
+                remaining = self.timeout - (now - blocked_since)
+                if remaining <= 0:
+                    self.lock_stats["lock_wait_s"] += now - blocked_since
+                    self.lock_stats["locked_errors"] += 1
+                    raise
+                self.lock_stats["busy_retries"] += 1
+                time.sleep(min(min(0.001 * (2 ** attempt), 0.05) * (1 + random.random()), remaining))
+                attempt += 1
+                continue
+            if blocked_since is not None:
+                self.lock_stats["lock_wait_s"] += time.perf_counter() - blocked_since
+            return result
+
+    def _execute(self, query, params=()):
+        """cursor.execute com novas tentativas quando o banco está bloqueado por outra conexão."""
+        return self._retry_when_locked(lambda: self.cursor.execute(query, params))
+
+    def _commit(self):
+        """conn.commit com novas tentativas quando o banco está bloqueado por outra conexão."""
+        return self._retry_when_locked(self.conn.commit)
 
     def disconnect(self):
         """Fecha a conexão com o banco de dados."""
@@ -40,14 +259,17 @@ class SQLiteDatabase:
         column_defs = ", ".join([f"{col_name} {col_type}" for col_name, col_type in columns.items()])
         query = f"CREATE TABLE IF NOT EXISTS {table_name} ({column_defs})"
         try:
-            self.cursor.execute(query)
+            self._execute(query)
             #índice na coluna 'name' se ele não existir, para melhorar a performance de busca
-            self.cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_name ON {table_name} (name)")
-            self.conn.commit()
+            self._execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_name ON {table_name} (name)")
+            #índice sem diferenciar maiúsculas, usado pela busca por prefixo enquanto se digita
+            self._execute(f"CREATE INDEX IF NOT EXISTS idx_{table_name}_name_nocase ON {table_name} (name COLLATE NOCASE)")
+            self._commit()
             return True
         except sqlite3.Error as e:
+            self.conn.rollback()
             logging.error(f"Erro ao criar a tabela '{table_name}' ou índice: {e}")
-            messagebox.showerror("Erro no Banco de Dados", f"Erro ao criar a tabela '{table_name}' ou índice: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao criar a tabela '{table_name}' ou índice: {e}")
             return False
 
     def insert_record(self, table_name, data):
@@ -57,19 +279,137 @@ class SQLiteDatabase:
         values = tuple(data.values())
         query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
         try:
-            self.cursor.execute(query, values)
-            self.conn.commit()
-            print(f"DEBUG: Record inserted successfully. Name: {data.get('name')}, ID: {self.cursor.lastrowid}")
+            self._execute(query, values)
+            self._commit()
+            logging.debug(f"Record inserted successfully. Name: {data.get('name')}, ID: {self.cursor.lastrowid}")
+            audit_event("insert", table=table_name, id=self.cursor.lastrowid, data=data)
             return self.cursor.lastrowid
         except sqlite3.IntegrityError as e: #erro de unicidade
+            self.conn.rollback() #não deixa a transação (e o lock de escrita) abertos
             logging.error(f"Erro de unicidade ao inserir registro: {e}")
-            messagebox.showerror("Erro de Unicidade", "Um ticket com este código já existe. Por favor, use um código diferente.")
+            show_db_error("Erro de Unicidade", "Um ticket com este código já existe. Por favor, use um código diferente.")
             return None
         except sqlite3.Error as e:
+            self.conn.rollback()
             logging.error(f"Erro ao inserir registro: {e}")
-            messagebox.showerror("Erro no Banco de Dados", f"Erro ao inserir registro: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao inserir registro: {e}")
+            return None
+
+    def upsert_record(self, table_name, data, conflict_policy="overwrite"):
+        """Insere um registro ou o mescla com o ticket de mesmo código. Ver upsert_records."""
+        return self.upsert_records(table_name, [data], conflict_policy)
+
+    def upsert_records(self, table_name, records, conflict_policy="overwrite"):
+        """Insere ou mescla registros pelo código do ticket ('name') em uma única transação.
+
+        Políticas de conflito:
+          'overwrite' - sobrescreve os campos do ticket existente;
+          'newest'    - sobrescreve apenas se a data recebida for igual ou mais recente;
+          'skip'      - mantém o ticket existente.
+        Todos os registros devem ter os mesmos campos (ValueError caso contrário).
+        Registros idênticos aos já gravados contam como ignorados, então repetir a mesma
+        sincronização não altera nada. O evento de auditoria lista os códigos inseridos e os
+        atualizados. Retorna um dicionário com as contagens 'inserted', 'updated' e 'skipped',
+        ou None em caso de erro.
+        """
+        if conflict_policy not in UPSERT_POLICIES:
+            raise ValueError(f"Política de conflito inválida: '{conflict_policy}'. Use uma de {UPSERT_POLICIES}.")
+
+        counts = {"inserted": 0, "updated": 0, "skipped": 0}
+        records = list(records)
+        if not records:
+            return counts
+
+        columns = list(records[0].keys())
+        #um único INSERT serve o lote todo; campos faltando virariam NULL e apagariam dados
+        first_keys = records[0].keys()
+        for index, record in enumerate(records):
+            if record.keys() != first_keys:
+                raise ValueError(f"Todos os registros devem ter os mesmos campos: o registro {index} tem "
+                                 f"{sorted(record)} e o primeiro tem {sorted(first_keys)}.")
+        if conflict_policy == "newest" and "date" not in columns:
+            raise ValueError("A política 'newest' exige o campo 'date' nos registros.")
+        query = self._build_upsert_query(table_name, columns, conflict_policy)
+
+        try:
+            self._execute("BEGIN IMMEDIATE")
+            #Decide, com as regras do ON CONFLICT, quais códigos serão inseridos, atualizados ou
+            #ignorados, para registrar na auditoria exatamente os tickets alterados
+            update_columns = [col for col in columns if col not in ("id", "name")]
+            current_rows = self._select_existing_rows(table_name, [record["name"] for record in records],
+                                                      update_columns)
+            inserted, updated = [], []
+            for record in records:
+                incoming = tuple(record.get(col) for col in update_columns)
+                current = current_rows.get(record["name"])
+                if current is None:
+                    inserted.append(record["name"])
+                elif self._upsert_would_update(current, incoming, update_columns, conflict_policy):
+                    updated.append(record["name"])
+                else:
+                    counts["skipped"] += 1
+                    continue
+                current_rows[record["name"]] = incoming #repetições no mesmo lote viram mesclagens
+
+            self.cursor.executemany(query, [tuple(record.get(col) for col in columns) for record in records])
+            self._commit()
+            counts["inserted"], counts["updated"] = len(inserted), len(updated)
+            logging.debug(f"upsert_records: {len(records)} records processed with policy '{conflict_policy}': {counts}")
+            audit_event("upsert", table=table_name, policy=conflict_policy, counts=counts,
+                        inserted=inserted, updated=updated)
+            return counts
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logging.error(f"Erro ao mesclar registros na tabela '{table_name}': {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao mesclar registros: {e}")
             return None
 
+    def _build_upsert_query(self, table_name, columns, conflict_policy):
+        """Monta o INSERT ... ON CONFLICT(name) correspondente à política de conflito."""
+        column_list = ", ".join(columns)
+        placeholders = ", ".join("?" * len(columns))
+        query = f"INSERT INTO {table_name} ({column_list}) VALUES ({placeholders}) ON CONFLICT(name) "
+
+        update_columns = [col for col in columns if col not in ("id", "name")]
+        if conflict_policy == "skip" or not update_columns:
+            return query + "DO NOTHING"
+
+        set_clause = ", ".join(f"{col} = excluded.{col}" for col in update_columns)
+        #só atualiza quando algo realmente mudou, mantendo a sincronização idempotente
+        where_clause = "(" + " OR ".join(f"{table_name}.{col} IS NOT excluded.{col}" for col in update_columns) + ")"
+        if conflict_policy == "newest":
+            #'dd/mm/yyyy' para 'yyyymmdd' para comparar as datas cronologicamente
+            incoming_date = "SUBSTR(excluded.date, 7, 4) || SUBSTR(excluded.date, 4, 2) || SUBSTR(excluded.date, 1, 2)"
+            current_date = (f"SUBSTR({table_name}.date, 7, 4) || SUBSTR({table_name}.date, 4, 2) || "
+                            f"SUBSTR({table_name}.date, 1, 2)")
+            where_clause += f" AND {incoming_date} >= {current_date}"
+        return query + f"DO UPDATE SET {set_clause} WHERE {where_clause}"
+
+    def _select_existing_rows(self, table_name, names, columns, chunk_size=500):
+        """Retorna {código: valores de 'columns'} dos códigos de ticket da lista que já existem na tabela."""
+        existing = {}
+        unique_names = list(dict.fromkeys(names))
+        selected = ", ".join(["name"] + columns)
+        for start in range(0, len(unique_names), chunk_size):
+            chunk = unique_names[start:start + chunk_size]
+            placeholders = ", ".join("?" * len(chunk))
+            self._execute(f"SELECT {selected} FROM {table_name} WHERE name IN ({placeholders})", chunk)
+            existing.update((row[0], tuple(row[1:])) for row in self.cursor.fetchall())
+        return existing
+
+    @staticmethod
+    def _upsert_would_update(current, incoming, columns, conflict_policy):
+        """Reproduz o WHERE de _build_upsert_query: True se o ticket existente seria atualizado."""
+        if conflict_policy == "skip" or not columns or current == incoming:
+            return False
+        if conflict_policy == "newest":
+            def date_key(date):
+                return date[6:10] + date[3:5] + date[0:2] if date is not None else None
+            incoming_date = date_key(incoming[columns.index("date")])
+            current_date = date_key(current[columns.index("date")])
+            return incoming_date is not None and current_date is not None and incoming_date >= current_date
+        return True
+
     def select_all_records(self, table_name, order_by="date", ascending=False):
         """Recupera todos os registros da tabela, com opção de ordenação."""
         order_direction = "ASC" if ascending else "DESC"
@@ -87,53 +427,82 @@ class SQLiteDatabase:
         query = f"SELECT * FROM {table_name} ORDER BY {sort_expression} {order_direction}"
         
         try:
-            self.cursor.execute(query)
+            self._execute(query)
             columns = [description[0] for description in self.cursor.description]
             records = self.cursor.fetchall()
-            print(f"DEBUG (select_all_records): Query executed: '{query}' - Fetched {len(records)} records.")
+            logging.debug(f"select_all_records: Query executed: '{query}' - Fetched {len(records)} records.")
             return columns, records
         except sqlite3.Error as e:
             logging.error(f"Erro ao selecionar todos os registros: {e} - Query: {query}")
-            messagebox.showerror("Erro no Banco de Dados", f"Erro ao selecionar todos os registros: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao selecionar todos os registros: {e}")
             return [], []
 
     def select_record_by_id(self, table_name, record_id):
         """Recupera um único registro pelo seu ID."""
         query = f"SELECT * FROM {table_name} WHERE id = ?"
         try:
-            self.cursor.execute(query, (record_id,))
+            self._execute(query, (record_id,))
             columns = [description[0] for description in self.cursor.description]
             record = self.cursor.fetchone()
             return columns, record
         except sqlite3.Error as e:
             logging.error(f"Erro ao selecionar registro por ID: {e}")
-            messagebox.showerror("Erro no Banco de Dados", f"Erro ao selecionar registro por ID: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao selecionar registro por ID: {e}")
             return [], None
 
     def select_records_by_name(self, table_name, name_query):
         """Recupera registros com base no nome (usando LIKE para busca parcial)."""
         query = f"SELECT * FROM {table_name} WHERE name LIKE ?"
         try:
-            self.cursor.execute(query, (f"%{name_query}%",))
+            self._execute(query, (f"%{name_query}%",))
             columns = [description[0] for description in self.cursor.description]
             records = self.cursor.fetchall()
             return columns, records
         except sqlite3.Error as e:
             logging.error(f"Erro ao selecionar registros por nome: {e}")
-            messagebox.showerror("Erro no Banco de Dados", f"Erro ao selecionar registros por nome: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao selecionar registros por nome: {e}")
+            return [], []
+
+    def select_records_by_name_prefix(self, table_name, prefix, limit=10):
+        """Recupera até 'limit' registros cujo nome começa com o prefixo, sem diferenciar maiúsculas.
+
+        Usa a faixa [prefixo, próximo prefixo) sobre o índice NOCASE em vez de LIKE '%...%',
+        evitando a varredura completa da tabela. Pode ser chamado fora da thread do Tk.
+        """
+        if not prefix:
+            return [], []
+        lower_bound = prefix.translate(_ASCII_LOWER)
+        next_char = chr(ord(lower_bound[-1]) + 1)
+        if "A" <= next_char <= "Z": #NOCASE trata 'A'..'Z' como 'a'..'z'; o próximo caractere real é '['
+            next_char = "["
+        upper_bound = lower_bound[:-1] + next_char
+        query = (f"SELECT * FROM {table_name} "
+                 f"WHERE name COLLATE NOCASE >= ? AND name COLLATE NOCASE < ? "
+                 f"ORDER BY name COLLATE NOCASE LIMIT ?")
+        try:
+            self._execute(query, (lower_bound, upper_bound, limit))
+            columns = [description[0] for description in self.cursor.description]
+            records = self.cursor.fetchall()
+            return columns, records
+        except sqlite3.OperationalError as e:
+            if "interrupted" not in str(e): #consulta cancelada por uma busca mais recente
+                logging.error(f"Erro ao buscar registros por prefixo: {e}")
+            return [], []
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao buscar registros por prefixo: {e}")
             return [], []
             
     def select_records_by_date(self, table_name, date_query):
         """Recupera registros com base na data exata."""
         query = f"SELECT * FROM {table_name} WHERE date = ?"
         try:
-            self.cursor.execute(query, (date_query,))
+            self._execute(query, (date_query,))
             columns = [description[0] for description in self.cursor.description]
             records = self.cursor.fetchall()
             return columns, records
         except sqlite3.Error as e:
             logging.error(f"Erro ao selecionar registros por data: {e}")
-            messagebox.showerror("Erro no Banco de Dados", f"Erro ao selecionar registros por data: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao selecionar registros por data: {e}")
             return [], []
 
     def select_records_by_status(self, table_name, status_query, order_by="date", ascending=False):
@@ -150,13 +519,13 @@ class SQLiteDatabase:
             
         query = f"SELECT * FROM {table_name} WHERE status = ? ORDER BY {sort_expression} {order_direction}"
         try:
-            self.cursor.execute(query, (status_query,))
+            self._execute(query, (status_query,))
             columns = [description[0] for description in self.cursor.description]
             records = self.cursor.fetchall()
             return columns, records
         except sqlite3.Error as e:
             logging.error(f"Erro ao selecionar registros por status: {e}")
-            messagebox.showerror("Erro no Banco de Dados", f"Erro ao selecionar registros por status: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao selecionar registros por status: {e}")
             return [], []
 
     def select_records_by_type(self, table_name, type_query, order_by="date", ascending=False):
@@ -173,13 +542,13 @@ class SQLiteDatabase:
             
         query = f"SELECT * FROM {table_name} WHERE type = ? ORDER BY {sort_expression} {order_direction}"
         try:
-            self.cursor.execute(query, (type_query,))
+            self._execute(query, (type_query,))
             columns = [description[0] for description in self.cursor.description]
             records = self.cursor.fetchall()
             return columns, records
         except sqlite3.Error as e:
             logging.error(f"Erro ao selecionar registros por tipo: {e}")
-            messagebox.showerror("Erro no Banco de Dados", f"Erro ao selecionar registros por tipo: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao selecionar registros por tipo: {e}")
             return [], []
 
     def update_record(self, table_name, record_id, new_data):
@@ -188,72 +557,968 @@ class SQLiteDatabase:
         values = tuple(new_data.values()) + (record_id,)
         query = f"UPDATE {table_name} SET {set_clause} WHERE id = ?"
         try:
-            self.cursor.execute(query, values)
-            self.conn.commit()
+            self._execute("BEGIN IMMEDIATE")
+            name = self._select_name_by_id(table_name, record_id) #IDs são locais: a auditoria usa o código
+            self._execute(query, values)
+            self._commit()
             if self.cursor.rowcount > 0:
-                print(f"DEBUG: Record {record_id} updated successfully.")
+                logging.debug(f"Record {record_id} updated successfully.")
+                audit_event("update", table=table_name, id=record_id, name=name, data=new_data)
                 return True
             else:
-                print(f"DEBUG: Record {record_id} not found or no changes made.")
+                logging.debug(f"Record {record_id} not found or no changes made.")
                 return False
         except sqlite3.IntegrityError as e: #erro de unicidade ao atualizar
+            self.conn.rollback()
             logging.error(f"Erro de unicidade ao atualizar registro {record_id}: {e}")
-            messagebox.showerror("Erro de Unicidade", "O código do ticket que você está tentando usar já existe em outro registro.")
+            show_db_error("Erro de Unicidade", "O código do ticket que você está tentando usar já existe em outro registro.")
             return False
         except sqlite3.Error as e:
+            self.conn.rollback()
             logging.error(f"Erro ao atualizar registro {record_id}: {e}")
-            messagebox.showerror("Erro no Banco de Dados", f"Erro ao atualizar registro {record_id}: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao atualizar registro {record_id}: {e}")
             return False
 
+    def _select_name_by_id(self, table_name, record_id):
+        """Retorna o código do ticket com o ID informado (None se não existir)."""
+        self._execute(f"SELECT name FROM {table_name} WHERE id = ?", (record_id,))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
     def delete_record(self, table_name, record_id):
         """Deleta um registro pelo seu ID."""
         query = f"DELETE FROM {table_name} WHERE id = ?"
         try:
-            self.cursor.execute(query, (record_id,))
-            self.conn.commit()
+            self._execute("BEGIN IMMEDIATE")
+            name = self._select_name_by_id(table_name, record_id) #depois do DELETE o código não existe mais
+            self._execute(query, (record_id,))
+            self._commit()
             if self.cursor.rowcount > 0:
-                print(f"DEBUG: Record {record_id} deleted successfully.")
+                logging.debug(f"Record {record_id} deleted successfully.")
+                audit_event("delete", table=table_name, id=record_id, name=name)
                 return True
             else:
-                print(f"DEBUG: Record {record_id} not found for deletion.")
+                logging.debug(f"Record {record_id} not found for deletion.")
                 return False
         except sqlite3.Error as e:
+            self.conn.rollback()
             logging.error(f"Erro ao deletar registro {record_id}: {e}")
-            messagebox.showerror("Erro no Banco de Dados", f"Erro ao deletar registro {record_id}: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao deletar registro {record_id}: {e}")
             return False
             
     def delete_all_records(self, table_name):
         """Deleta todos os registros da tabela."""
         query = f"DELETE FROM {table_name}"
         try:
-            self.cursor.execute(query)
-            self.conn.commit()
-            print(f"DEBUG: All records from {table_name} deleted successfully.")
+            self._execute("BEGIN IMMEDIATE")
+            self._execute(f"SELECT name FROM {table_name} ORDER BY id")
+            deleted = [row[0] for row in self.cursor.fetchall()]
+            self._execute(query)
+            self._commit()
+            logging.debug(f"All records from {table_name} deleted successfully.")
+            audit_event("delete_all", table=table_name, count=len(deleted), names=deleted)
             return True
         except sqlite3.Error as e:
+            self.conn.rollback()
             logging.error(f"Erro ao deletar todos os registros da tabela '{table_name}': {e}")
-            messagebox.showerror("Erro no Banco de Dados", f"Erro ao deletar todos os registros da tabela '{table_name}': {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao deletar todos os registros da tabela '{table_name}': {e}")
+            return False
+
+    def create_rollup_tables(self, table_name):
+        """Cria o resumo diário (dia x tipo x status) e o histórico de status, mantidos por triggers.
+
+        As triggers atualizam as duas tabelas a cada INSERT/UPDATE/DELETE em 'table_name',
+        qualquer que seja o caminho (painel, upsert ou importação), então os relatórios leem
+        poucas linhas agregadas em vez de varrer todos os tickets. Ao encerrar uma passagem
+        por um status, a trigger também soma a duração dela em '{table_name}_status_time'
+        (total de horas e quantidade por status), lido por select_time_in_status.
+        Na primeira execução o resumo é montado a partir dos tickets existentes.
+        """
+        rollup_table = f"{table_name}_daily_rollup"
+        history_table = f"{table_name}_status_history"
+        status_time_table = f"{table_name}_status_time"
+
+        def day_of(row):
+            #'dd/mm/yyyy' para 'yyyy-mm-dd'; datas vazias ou inválidas ficam em ''
+            return (f"CASE WHEN {row}.date GLOB '[0-9][0-9]/[0-9][0-9]/[0-9][0-9][0-9][0-9]' "
+                    f"THEN SUBSTR({row}.date, 7, 4) || '-' || SUBSTR({row}.date, 4, 2) || '-' || SUBSTR({row}.date, 1, 2) "
+                    f"ELSE '' END")
+
+        def increment(row):
+            return (f"INSERT INTO {rollup_table} (day, type, status, count) "
+                    f"VALUES ({day_of(row)}, COALESCE({row}.type, ''), COALESCE({row}.status, ''), 1) "
+                    f"ON CONFLICT(day, type, status) DO UPDATE SET count = count + 1;")
+
+        def decrement(row):
+            key = (f"day = {day_of(row)} AND type = COALESCE({row}.type, '') "
+                   f"AND status = COALESCE({row}.status, '')")
+            return (f"UPDATE {rollup_table} SET count = count - 1 WHERE {key}; "
+                    f"DELETE FROM {rollup_table} WHERE {key} AND count <= 0;")
+
+        close_history = (f"INSERT INTO {status_time_table} (status, closed_hours, closed_count) "
+                         f"SELECT COALESCE(status, ''), (julianday('now') - julianday(entered_at)) * 24, 1 "
+                         f"FROM {history_table} WHERE ticket_id = OLD.id AND left_at IS NULL "
+                         f"ON CONFLICT(status) DO UPDATE SET closed_hours = closed_hours + excluded.closed_hours, "
+                         f"closed_count = closed_count + excluded.closed_count; "
+                         f"UPDATE {history_table} SET left_at = datetime('now') "
+                         f"WHERE ticket_id = OLD.id AND left_at IS NULL;")
+        open_history = (f"INSERT INTO {history_table} (ticket_id, status, entered_at) "
+                        f"VALUES (NEW.id, NEW.status, datetime('now'));")
+
+        triggers = {
+            f"trg_{table_name}_rollup_insert": f"AFTER INSERT ON {table_name} BEGIN {increment('NEW')} {open_history} END",
+            f"trg_{table_name}_rollup_update": (f"AFTER UPDATE OF date, type, status ON {table_name} "
+                                                f"WHEN OLD.date IS NOT NEW.date OR OLD.type IS NOT NEW.type "
+                                                f"OR OLD.status IS NOT NEW.status "
+                                                f"BEGIN {decrement('OLD')} {increment('NEW')} END"),
+            f"trg_{table_name}_status_history": (f"AFTER UPDATE OF status ON {table_name} "
+                                                 f"WHEN OLD.status IS NOT NEW.status "
+                                                 f"BEGIN {close_history} {open_history} END"),
+            f"trg_{table_name}_rollup_delete": f"AFTER DELETE ON {table_name} BEGIN {decrement('OLD')} {close_history} END",
+        }
+
+        try:
+            self._execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE ?",
+                                (f"trg_{table_name}_%",))
+            existing_triggers = {row[0] for row in self.cursor.fetchall()}
+            self._execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (status_time_table,))
+            if set(triggers) <= existing_triggers and self.cursor.fetchone():
+                return True
+
+            self._execute("BEGIN IMMEDIATE")
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {rollup_table} ("
+                                f"day TEXT NOT NULL, type TEXT NOT NULL, status TEXT NOT NULL, "
+                                f"count INTEGER NOT NULL, PRIMARY KEY (day, type, status)) WITHOUT ROWID")
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {history_table} ("
+                                f"id INTEGER PRIMARY KEY AUTOINCREMENT, ticket_id INTEGER NOT NULL, status TEXT, "
+                                f"entered_at TEXT NOT NULL, left_at TEXT)")
+            self.cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{history_table}_open "
+                                f"ON {history_table} (ticket_id) WHERE left_at IS NULL")
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {status_time_table} ("
+                                f"status TEXT PRIMARY KEY, closed_hours REAL NOT NULL, "
+                                f"closed_count INTEGER NOT NULL) WITHOUT ROWID")
+
+            #Monta o resumo a partir dos tickets existentes; o histórico dos tickets antigos
+            #começa agora, pois a data de entrada no status atual é desconhecida
+            self.cursor.execute(f"DELETE FROM {rollup_table}")
+            self.cursor.execute(f"INSERT INTO {rollup_table} (day, type, status, count) "
+                                f"SELECT {day_of(table_name)}, COALESCE(type, ''), COALESCE(status, ''), COUNT(*) "
+                                f"FROM {table_name} GROUP BY 1, 2, 3")
+            self.cursor.execute(f"INSERT INTO {history_table} (ticket_id, status, entered_at) "
+                                f"SELECT id, status, datetime('now') FROM {table_name} "
+                                f"WHERE id NOT IN (SELECT ticket_id FROM {history_table} WHERE left_at IS NULL)")
+            #bancos criados antes do total por status: soma as passagens já encerradas
+            self.cursor.execute(f"DELETE FROM {status_time_table}")
+            self.cursor.execute(f"INSERT INTO {status_time_table} (status, closed_hours, closed_count) "
+                                f"SELECT COALESCE(status, ''), SUM((julianday(left_at) - julianday(entered_at)) * 24), "
+                                f"COUNT(*) FROM {history_table} WHERE left_at IS NOT NULL GROUP BY 1")
+
+            for trigger_name, trigger_body in triggers.items():
+                self.cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+                self.cursor.execute(f"CREATE TRIGGER {trigger_name} {trigger_body}")
+            self._commit()
+            logging.debug(f"create_rollup_tables: Rollup tables for {table_name} created.")
+            return True
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logging.error(f"Erro ao criar as tabelas de resumo de '{table_name}': {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao criar as tabelas de resumo de '{table_name}': {e}")
             return False
 
+    def select_daily_rollup(self, table_name, start_day=None, end_day=None):
+        """Recupera o resumo diário (dia no formato 'yyyy-mm-dd'), opcionalmente limitado a um intervalo."""
+        conditions, params = [], []
+        if start_day:
+            conditions.append("day >= ?")
+            params.append(start_day)
+        if end_day:
+            conditions.append("day <= ?")
+            params.append(end_day)
+        where_clause = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        query = f"SELECT day, type, status, count FROM {table_name}_daily_rollup {where_clause}ORDER BY day DESC, type, status"
+        try:
+            self._execute(query, params)
+            columns = [description[0] for description in self.cursor.description]
+            records = self.cursor.fetchall()
+            return columns, records
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao selecionar o resumo diário: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao selecionar o resumo diário: {e}")
+            return [], []
+
+    def select_time_in_status(self, table_name):
+        """Recupera, por status, o tempo médio (em horas) das passagens já encerradas e os tickets ainda nele.
+
+        Lê apenas os totais por status e o resumo diário, sem varrer o histórico.
+        """
+        query = (f"SELECT status, ROUND(SUM(closed_hours) / NULLIF(SUM(closed_count), 0), 2) AS avg_hours, "
+                 f"SUM(closed_count) AS transitions, SUM(current) AS current FROM ("
+                 f"SELECT status, closed_hours, closed_count, 0 AS current FROM {table_name}_status_time "
+                 f"UNION ALL SELECT status, 0, 0, count FROM {table_name}_daily_rollup) "
+                 f"GROUP BY status ORDER BY status")
+        try:
+            self._execute(query)
+            columns = [description[0] for description in self.cursor.description]
+            records = self.cursor.fetchall()
+            return columns, records
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao calcular o tempo em cada status: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao calcular o tempo em cada status: {e}")
+            return [], []
+
+    def create_change_log(self, table_name):
+        """Cria o registro de alterações (append-only) de 'table_name', alimentado por triggers.
+
+        Cada INSERT/UPDATE/DELETE gera uma linha com número de sequência crescente, operação
+        ('upsert' ou 'delete') e os campos do ticket, identificado pelo código ('name'), já que
+        os IDs diferem entre bancos. 'origin' e 'origin_seq' identificam o banco onde a
+        alteração nasceu e a sequência dela lá (NULL quando é local). A tabela de versões
+        guarda, por código de ticket, a versão vigente (changed_at, origin, origin_seq), usada
+        por apply_changes para decidir conflitos (vence a última gravação).
+        Na primeira execução os tickets existentes são registrados como 'upsert', para que um
+        banco vazio possa ser sincronizado por completo. Um banco criado copiando o arquivo de
+        outro herda o identificador dele e precisa de reset_site_id antes de sincronizar.
+        """
+        changes_table = f"{table_name}_changes"
+        versions_table = f"{table_name}_versions"
+        field_list = ", ".join(CHANGE_FIELDS)
+        now = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+        #apply_changes registra as alterações recebidas ele mesmo, com a origem e o horário originais
+        local_only = f"NOT EXISTS (SELECT 1 FROM {table_name}_sync_applying)"
+
+        def log_row(op, row):
+            values = ", ".join(f"{row}.{field}" for field in CHANGE_FIELDS)
+            return (f"INSERT INTO {changes_table} (op, {field_list}, changed_at) "
+                    f"VALUES ('{op}', {values}, {now});")
+
+        changed = " OR ".join(f"OLD.{field} IS NOT NEW.{field}" for field in CHANGE_FIELDS)
+        triggers = {
+            f"trg_{table_name}_changes_version": (f"AFTER INSERT ON {changes_table} BEGIN "
+                                                  f"INSERT INTO {versions_table} (name, changed_at, origin, origin_seq) "
+                                                  f"VALUES (NEW.name, NEW.changed_at, "
+                                                  f"COALESCE(NEW.origin, (SELECT site_id FROM {table_name}_sync_site)), "
+                                                  f"COALESCE(NEW.origin_seq, NEW.seq)) "
+                                                  f"ON CONFLICT(name) DO UPDATE SET changed_at = excluded.changed_at, "
+                                                  f"origin = excluded.origin, origin_seq = excluded.origin_seq; END"),
+            f"trg_{table_name}_changes_insert": (f"AFTER INSERT ON {table_name} WHEN {local_only} "
+                                                 f"BEGIN {log_row('upsert', 'NEW')} END"),
+            f"trg_{table_name}_changes_update": (f"AFTER UPDATE ON {table_name} WHEN ({changed}) AND {local_only} BEGIN "
+                                                 #troca de código: o código antigo deixa de existir nos outros bancos
+                                                 f"INSERT INTO {changes_table} (op, name, changed_at) "
+                                                 f"SELECT 'delete', OLD.name, {now} WHERE OLD.name IS NOT NEW.name; "
+                                                 f"{log_row('upsert', 'NEW')} END"),
+            f"trg_{table_name}_changes_delete": (f"AFTER DELETE ON {table_name} WHEN {local_only} BEGIN "
+                                                 f"INSERT INTO {changes_table} (op, name, changed_at) "
+                                                 f"VALUES ('delete', OLD.name, {now}); END"),
+        }
+
+        try:
+            self._execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE ?",
+                                (f"trg_{table_name}_changes_%",))
+            if set(triggers) <= {row[0] for row in self.cursor.fetchall()}:
+                return True
+
+            self._execute("BEGIN IMMEDIATE")
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {changes_table} ("
+                                f"seq INTEGER PRIMARY KEY AUTOINCREMENT, op TEXT NOT NULL, name TEXT NOT NULL, "
+                                f"type TEXT, date TEXT, status TEXT, origin TEXT, origin_seq INTEGER, "
+                                f"changed_at TEXT NOT NULL)")
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {versions_table} ("
+                                f"name TEXT PRIMARY KEY, changed_at TEXT NOT NULL, origin TEXT NOT NULL, "
+                                f"origin_seq INTEGER NOT NULL) WITHOUT ROWID")
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name}_sync_applying (flag INTEGER)")
+            #posição de leitura no registro de cada banco que já enviou alterações para cá
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name}_sync_state ("
+                                f"source TEXT PRIMARY KEY, last_seq INTEGER NOT NULL)")
+            #maior sequência já vista de cada banco de origem, venha ela direto ou repassada
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name}_sync_origin_state ("
+                                f"origin TEXT PRIMARY KEY, last_seq INTEGER NOT NULL)")
+            #identificador deste banco como origem de alterações
+            self.cursor.execute(f"CREATE TABLE IF NOT EXISTS {table_name}_sync_site (site_id TEXT NOT NULL)")
+            self.cursor.execute(f"INSERT INTO {table_name}_sync_site (site_id) "
+                                f"SELECT ? WHERE NOT EXISTS (SELECT 1 FROM {table_name}_sync_site)",
+                                (uuid.uuid4().hex,))
+
+            version_trigger = f"trg_{table_name}_changes_version"
+            self.cursor.execute(f"DROP TRIGGER IF EXISTS {version_trigger}")
+            self.cursor.execute(f"CREATE TRIGGER {version_trigger} {triggers[version_trigger]}")
+
+            self.cursor.execute(f"SELECT COUNT(*) FROM {changes_table}")
+            if self.cursor.fetchone()[0] == 0:
+                self.cursor.execute(f"INSERT INTO {changes_table} (op, {field_list}, changed_at) "
+                                    f"SELECT 'upsert', {field_list}, {now} FROM {table_name} ORDER BY id")
+
+            for trigger_name, trigger_body in triggers.items():
+                if trigger_name == version_trigger:
+                    continue
+                self.cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name}")
+                self.cursor.execute(f"CREATE TRIGGER {trigger_name} {trigger_body}")
+            self._commit()
+            logging.debug(f"create_change_log: Change log for {table_name} created.")
+            return True
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logging.error(f"Erro ao criar o registro de alterações de '{table_name}': {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao criar o registro de alterações de '{table_name}': {e}")
+            return False
+
+    def get_site_id(self, table_name):
+        """Retorna o identificador deste banco como origem do registro de alterações."""
+        try:
+            self._execute(f"SELECT site_id FROM {table_name}_sync_site")
+            row = self.cursor.fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao ler o identificador do banco: {e}")
+            return None
+
+    def reset_site_id(self, table_name):
+        """Dá um novo identificador a um banco criado copiando o arquivo de outro.
+
+        A cópia herda o identificador do original, e as alterações de um pareceriam vir do
+        próprio outro (sync_databases recusa sincronizar os dois). Rodar na cópia, uma vez.
+        Na próxima sincronização a cópia reenvia o registro que herdou: o que o original já
+        tem empata pelo horário e não muda nada, e o editado na cópia depois dela vence por
+        ser mais recente. Retorna o novo identificador, ou None em caso de erro.
+        """
+        new_site_id = uuid.uuid4().hex
+        try:
+            self._execute(f"UPDATE {table_name}_sync_site SET site_id = ?", (new_site_id,))
+            self._commit()
+            logging.debug(f"reset_site_id: Site id of {self.db_name} changed to {new_site_id}.")
+            return new_site_id
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logging.error(f"Erro ao gerar um novo identificador para '{self.db_name}': {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao gerar um novo identificador para o banco: {e}")
+            return None
+
+    def get_last_synced_seq(self, table_name, source):
+        """Retorna o último número de sequência já aplicado vindo do banco 'source' (0 se nenhum)."""
+        try:
+            self._execute(f"SELECT last_seq FROM {table_name}_sync_state WHERE source = ?", (source,))
+            row = self.cursor.fetchone()
+            return row[0] if row else 0
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao ler o estado de sincronização: {e}")
+            return 0
+
+    def select_changes(self, table_name, since_seq=0, limit=None, exclude_origin=None):
+        """Recupera as alterações com número de sequência maior que 'since_seq', em ordem.
+
+        As colunas 'origin' e 'origin_seq' vêm preenchidas com o banco onde a alteração
+        nasceu e a sequência dela lá (este banco e 'seq', se local). Alterações originadas em
+        'exclude_origin' são omitidas.
+        """
+        site_id = self.get_site_id(table_name)
+        query = (f"SELECT seq, op, {', '.join(CHANGE_FIELDS)}, COALESCE(origin, ?) AS origin, "
+                 f"COALESCE(origin_seq, seq) AS origin_seq, changed_at "
+                 f"FROM {table_name}_changes WHERE seq > ?")
+        params = [site_id, since_seq]
+        if exclude_origin:
+            query += " AND COALESCE(origin, ?) IS NOT ?"
+            params.extend([site_id, exclude_origin])
+        query += " ORDER BY seq"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        try:
+            self._execute(query, params)
+            columns = [description[0] for description in self.cursor.description]
+            records = self.cursor.fetchall()
+            return columns, records
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao selecionar alterações: {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao selecionar alterações: {e}")
+            return [], []
+
+    def apply_changes(self, table_name, changes, source):
+        """Aplica, em uma transação, alterações vindas do registro de outro banco ('source').
+
+        'changes' é uma sequência de dicionários como os de select_changes. Uma alteração é
+        ignorada se nasceu neste banco, se a sequência dela no banco de origem não é maior que
+        a última já vista dessa origem (mesmo que repassada por um terceiro banco) ou se não
+        vence a versão vigente do ticket: vence a maior (changed_at, origin, origin_seq), então
+        todos os bancos chegam ao mesmo resultado, em qualquer ordem de sincronização.
+        As alterações aplicadas entram no registro deste banco com a origem e o horário
+        originais. Retorna um dicionário com as contagens 'applied' e 'skipped', ou None em
+        caso de erro.
+        """
+        counts = {"applied": 0, "skipped": 0}
+        upsert_query = self._build_upsert_query(table_name, list(CHANGE_FIELDS), "overwrite")
+        delete_query = f"DELETE FROM {table_name} WHERE name = ?"
+        log_query = (f"INSERT INTO {table_name}_changes (op, {', '.join(CHANGE_FIELDS)}, origin, origin_seq, changed_at) "
+                     f"VALUES (?, {', '.join('?' * len(CHANGE_FIELDS))}, ?, ?, ?)")
+        origin_seqs = {}
+        upserted, deleted = [], []
+        try:
+            self._execute("BEGIN IMMEDIATE")
+            site_id = self.get_site_id(table_name)
+            last_seq = self.get_last_synced_seq(table_name, source)
+            self.cursor.execute(f"INSERT INTO {table_name}_sync_applying (flag) VALUES (1)")
+            for change in changes:
+                if change["seq"] <= last_seq:
+                    counts["skipped"] += 1
+                    continue
+                last_seq = change["seq"]
+                origin = change.get("origin") or source
+                origin_seq = change.get("origin_seq") or change["seq"]
+                if origin not in origin_seqs:
+                    self.cursor.execute(f"SELECT last_seq FROM {table_name}_sync_origin_state WHERE origin = ?", (origin,))
+                    row = self.cursor.fetchone()
+                    origin_seqs[origin] = row[0] if row else 0
+                if origin == site_id or origin_seq <= origin_seqs[origin]:
+                    counts["skipped"] += 1
+                    continue
+                origin_seqs[origin] = origin_seq
+
+                #última gravação vence; empates de horário são decididos pela origem e sequência
+                self.cursor.execute(f"SELECT changed_at, origin, origin_seq FROM {table_name}_versions WHERE name = ?",
+                                    (change["name"],))
+                current_version = self.cursor.fetchone()
+                if current_version and (change["changed_at"], origin, origin_seq) <= tuple(current_version):
+                    counts["skipped"] += 1
+                    continue
+
+                if change["op"] == "delete":
+                    self.cursor.execute(delete_query, (change["name"],))
+                    if self.cursor.rowcount > 0:
+                        deleted.append(change["name"])
+                else:
+                    self.cursor.execute(upsert_query, tuple(change.get(field) for field in CHANGE_FIELDS))
+                    if self.cursor.rowcount > 0:
+                        upserted.append(change["name"])
+                self.cursor.execute(log_query, (change["op"],) + tuple(change.get(field) for field in CHANGE_FIELDS)
+                                    + (origin, origin_seq, change["changed_at"]))
+                counts["applied"] += 1
+            self.cursor.execute(f"DELETE FROM {table_name}_sync_applying")
+            self.cursor.execute(f"INSERT INTO {table_name}_sync_state (source, last_seq) VALUES (?, ?) "
+                                f"ON CONFLICT(source) DO UPDATE SET last_seq = excluded.last_seq", (source, last_seq))
+            self.cursor.executemany(f"INSERT INTO {table_name}_sync_origin_state (origin, last_seq) VALUES (?, ?) "
+                                    f"ON CONFLICT(origin) DO UPDATE SET last_seq = MAX(last_seq, excluded.last_seq)",
+                                    list(origin_seqs.items()))
+            self._commit()
+            logging.debug(f"apply_changes: Changes from {source} applied up to seq {last_seq}: {counts}")
+            audit_event("sync_apply", table=table_name, source=source, last_seq=last_seq, counts=counts,
+                        upserted=upserted, deleted=deleted)
+            return counts
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            logging.error(f"Erro ao aplicar alterações de '{source}': {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao aplicar alterações: {e}")
+            return None
+
     def count_total_records(self, table_name):
         """Conta o número total de registros na tabela."""
         query = f"SELECT COUNT(*) FROM {table_name}"
         try:
-            self.cursor.execute(query)
+            self._execute(query)
             count = self.cursor.fetchone()[0]
-            print(f"DEBUG (count_total_records): Total records in {table_name}: {count}")
+            logging.debug(f"count_total_records: Total records in {table_name}: {count}")
             return count
         except sqlite3.Error as e:
             logging.error(f"Erro ao contar registros da tabela '{table_name}': {e}")
             return 0
 
 
+# --- Réplica somente leitura para relatórios ---
+class ReportingDatabase(SQLiteDatabase):
+    """Conexão somente leitura para relatórios, separada da conexão de edição.
+
+    Lê o banco diretamente (mode=ro) ou, se 'snapshot_name' for informado, uma cópia
+    renovada com refresh_snapshot(), para que varreduras longas não disputem locks com o
+    painel que está editando. Usa mmap_size e cache de páginas grandes, de modo que as
+    varreduras sejam servidas a partir de páginas mapeadas em memória.
+
+    Com copy_now=False a primeira cópia não é feita no construtor: quem usa a réplica chama
+    copy_snapshot_to_temp() em outra thread e swap_snapshot() na thread da conexão. Até lá
+    é usada a cópia anterior, se existir (sem ela, 'conn' fica None).
+    """
+    def __init__(self, db_name="records_gui.db", snapshot_name=None, mmap_size=1024 ** 3, cache_size_kib=256 * 1024,
+                 copy_now=True):
+        self.source_name = db_name
+        self.snapshot_name = snapshot_name
+        self.mmap_size = mmap_size
+        self.cache_size_kib = cache_size_kib
+        self.refreshed_at = None
+        if snapshot_name and os.path.exists(snapshot_name):
+            self.refreshed_at = os.path.getmtime(snapshot_name)
+        #abre a cópia anterior, se houver; só depois (com db_name e lock_stats prontos) copia de novo
+        super().__init__(snapshot_name or db_name)
+        if snapshot_name and copy_now:
+            self._copy_snapshot()
+
+    def connect(self):
+        """Abre a conexão somente leitura com mmap e cache de páginas ampliados."""
+        if self.snapshot_name and not os.path.exists(self.db_name): #snapshot ainda não copiado
+            self.conn = None
+            self.cursor = None
+            return
+        try:
+            self.conn = sqlite3.connect(f"{Path(self.db_name).resolve().as_uri()}?mode=ro", uri=True)
+            self.conn.execute("PRAGMA query_only = ON")
+            self.conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+            self.conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+            self.cursor = self.conn.cursor()
+        except sqlite3.Error as e:
+            logging.error(f"Erro ao abrir a réplica de relatórios '{self.db_name}': {e}")
+            show_db_error("Erro no Banco de Dados", f"Erro ao abrir a réplica de relatórios: {e}")
+
+    def copy_snapshot_to_temp(self):
+        """Copia o banco de origem para o arquivo temporário do snapshot com a API de backup do SQLite.
+
+        Usa apenas conexões próprias, então pode rodar fora da thread da conexão de leitura.
+        A cópia é feita em etapas, e o lock de leitura na origem é liberado entre elas, então o
+        painel continua gravando normalmente durante a cópia. Retorna o horário da cópia.
+        """
+        temp_name = f"{self.snapshot_name}.tmp"
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        source = sqlite3.connect(f"{Path(self.source_name).resolve().as_uri()}?mode=ro", uri=True)
+        target = sqlite3.connect(temp_name)
+        try:
+            source.backup(target, pages=1024)
+        finally:
+            target.close()
+            source.close()
+        return time.time()
+
+    def swap_snapshot(self, copied_at):
+        """Passa a ler a cópia feita por copy_snapshot_to_temp(). Deve rodar na thread da conexão."""
+        if self.conn: #a réplica aberta precisa ser fechada antes de substituir o arquivo (Windows)
+            self.disconnect()
+            self.conn = None
+        try:
+            os.replace(f"{self.snapshot_name}.tmp", self.snapshot_name)
+            self.refreshed_at = copied_at
+        finally:
+            self.connect()
+
+    def _copy_snapshot(self):
+        """Copia o banco de origem e passa a ler a nova cópia (na thread atual)."""
+        self.swap_snapshot(self.copy_snapshot_to_temp())
+
+    def refresh_snapshot(self):
+        """Renova o snapshot a partir do banco de origem e reabre a conexão de leitura."""
+        if not self.snapshot_name:
+            return True
+        try:
+            self._copy_snapshot()
+        except (sqlite3.Error, OSError) as e:
+            logging.error(f"Erro ao atualizar a réplica de relatórios '{self.snapshot_name}': {e}")
+            return False
+        finally:
+            if not self.conn:
+                self.connect()
+        logging.debug(f"refresh_snapshot: Snapshot '{self.snapshot_name}' refreshed from '{self.source_name}'.")
+        return True
+
+    def replica_age(self):
+        """Retorna há quantos segundos a réplica foi copiada (0 quando lê o banco diretamente)."""
+        if not self.snapshot_name or self.refreshed_at is None:
+            return 0.0
+        return time.time() - self.refreshed_at
+
+
+# --- Busca incremental por prefixo ---
+class TicketSearchWorker:
+    """Executa buscas por prefixo em uma thread própria, com uma conexão própria ao banco.
+
+    Só a busca mais recente interessa: pedidos antigos ainda na fila são descartados e a
+    consulta em andamento é interrompida assim que um novo pedido chega.
+    """
+    def __init__(self, db_name, table_name, limit=10):
+        self.db_name = db_name
+        self.table_name = table_name
+        self.limit = limit
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.generation = 0
+        self.pending = False
+        self.db = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        """Descarta a busca atual e interrompe a consulta em andamento, se houver."""
+        self.generation += 1
+        self.pending = False
+        if self.db and self.db.conn:
+            self.db.conn.interrupt()
+
+    def search(self, prefix):
+        """Agenda uma nova busca, substituindo as anteriores. Retorna o número da geração."""
+        self.cancel()
+        self.pending = True
+        self.requests.put((self.generation, prefix))
+        return self.generation
+
+    def _run(self):
+        self.db = SQLiteDatabase(self.db_name)
+        while True:
+            generation, prefix = self.requests.get()
+            try:
+                while True: #fica apenas com o pedido mais recente da fila
+                    generation, prefix = self.requests.get_nowait()
+            except queue.Empty:
+                pass
+            if generation != self.generation:
+                continue
+            columns, records = self.db.select_records_by_name_prefix(self.table_name, prefix, self.limit)
+            if generation == self.generation:
+                self.results.put((generation, columns, records))
+
+
+# --- Importação paralela de arquivos CSV/JSONL ---
+def _normalize_ticket_rows(lines, file_format, header=None):
+    """Valida e normaliza um bloco de linhas de um arquivo de importação.
+
+    Executada nos processos de trabalho. Retorna (registros válidos, quantidade rejeitada).
+    """
+    if file_format == "csv":
+        rows = csv.DictReader(lines, fieldnames=header)
+    else:
+        rows = lines
+
+    valid_records = []
+    rejected = 0
+    for row in rows:
+        if file_format == "jsonl":
+            if not row.strip():
+                continue
+            try:
+                row = json.loads(row)
+            except ValueError:
+                rejected += 1
+                continue
+            if not isinstance(row, dict):
+                rejected += 1
+                continue
+
+        name = str(row.get("name") or "").strip()
+        date_val = str(row.get("date") or "").strip()
+        iso_match = _ISO_DATE_RE.match(date_val)
+        if iso_match: #'aaaa-mm-dd' (comum em exportações) para 'dd/mm/aaaa'
+            year, month, day = iso_match.groups()
+            date_val = f"{day}/{month}/{year}"
+        if not name or (date_val and _parse_ticket_date(date_val) is None):
+            rejected += 1
+            continue
+
+        valid_records.append({
+            "name": name,
+            "type": str(row.get("type") or "").strip(),
+            "date": date_val,
+            "status": str(row.get("status") or "").strip()
+        })
+    return valid_records, rejected
+
+
+def _submit_ingest_chunks(pool, paths, batch_size, batches, stop_event):
+    """Lê os arquivos em blocos de linhas e envia cada bloco ao pool, na ordem de leitura.
+
+    Roda em uma thread própria; a fila limitada 'batches' bloqueia a leitura quando o
+    gravador fica para trás (backpressure).
+    """
+    try:
+        for path in paths:
+            file_format = "csv" if path.lower().endswith(".csv") else "jsonl"
+            with open(path, encoding="utf-8-sig", newline="") as input_file:
+                header = next(csv.reader([input_file.readline()]), None) if file_format == "csv" else None
+                while not stop_event.is_set():
+                    lines = list(itertools.islice(input_file, batch_size))
+                    if not lines:
+                        break
+                    batches.put(pool.submit(_normalize_ticket_rows, lines, file_format, header))
+    except Exception as e:
+        batches.put(e)
+    finally:
+        batches.put(None)
+
+
+def ingest_files(db, table_name, paths, workers=None, batch_size=5000, conflict_policy="overwrite", max_pending=None):
+    """Importa arquivos CSV/JSONL validando os blocos em paralelo em um pool de processos.
+
+    A leitura e a validação são distribuídas entre 'workers' processos; os blocos validados
+    são gravados por um único escritor (a conexão 'db', nesta thread) na mesma ordem em que
+    aparecem nos arquivos, por meio de upsert_records. Assim, quando um código de ticket se
+    repete, o resultado é sempre o mesmo: vale a política de conflito aplicada na ordem
+    dos arquivos. No máximo 'max_pending' blocos ficam em memória ao mesmo tempo.
+    Retorna um dicionário com as contagens 'inserted', 'updated', 'skipped' e 'rejected'.
+    """
+    workers = workers or os.cpu_count() or 1
+    totals = {"inserted": 0, "updated": 0, "skipped": 0, "rejected": 0}
+    batches = queue.Queue(maxsize=max_pending or workers * 2)
+    stop_event = threading.Event()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        reader = threading.Thread(target=_submit_ingest_chunks,
+                                  args=(pool, paths, batch_size, batches, stop_event), daemon=True)
+        reader.start()
+        error = None
+        while True:
+            item = batches.get()
+            if item is None:
+                break
+            if error is not None: #esvazia a fila para liberar a thread de leitura
+                continue
+            if isinstance(item, Exception):
+                error = item
+                continue
+            records, rejected = item.result()
+            totals["rejected"] += rejected
+            try:
+                counts = db.upsert_records(table_name, records, conflict_policy)
+            except DatabaseError as e: #linha de comando: para a leitura antes de repassar o erro
+                counts, error = None, e
+            if counts is None:
+                error = error or sqlite3.Error("Falha ao gravar um bloco importado.")
+                stop_event.set()
+                continue
+            for key, value in counts.items():
+                totals[key] += value
+        reader.join()
+
+    if error is not None:
+        logging.error(f"Erro na importação de {paths}: {error}")
+        raise error
+    logging.debug(f"ingest_files: {len(paths)} file(s) ingested with {workers} worker(s): {totals}")
+    return totals
+
+
+# --- Sincronização incremental entre bancos ---
+def sync_databases(source_db, target_db, table_name, batch_size=10000):
+    """Envia ao banco de destino apenas as alterações da origem ainda não aplicadas nele.
+
+    Retoma a partir do último número de sequência registrado no destino para esta origem,
+    então o custo é proporcional às alterações, não ao tamanho da tabela.
+    """
+    source_id = source_db.get_site_id(table_name)
+    target_id = target_db.get_site_id(table_name)
+    if source_id == target_id:
+        #arquivo copiado de outro: as alterações seriam tomadas como do próprio destino e descartadas
+        raise ValueError(f"'{source_db.db_name}' e '{target_db.db_name}' têm o mesmo identificador de banco "
+                         f"({source_id}). Se um é cópia do outro, rode 'reset-site-id' na cópia antes de sincronizar.")
+    totals = {"applied": 0, "skipped": 0}
+    since_seq = target_db.get_last_synced_seq(table_name, source_id)
+    while True:
+        #alterações que vieram do próprio destino não voltam para ele
+        columns, records = source_db.select_changes(table_name, since_seq, limit=batch_size, exclude_origin=target_id)
+        if not records:
+            break
+        counts = target_db.apply_changes(table_name, [dict(zip(columns, record)) for record in records], source_id)
+        if counts is None:
+            raise sqlite3.Error(f"Falha ao aplicar as alterações de '{source_id}' a partir da sequência {since_seq}.")
+        for key, value in counts.items():
+            totals[key] += value
+        since_seq = records[-1][0]
+    logging.debug(f"sync_databases: Synced {source_db.db_name} -> {target_db.db_name} up to seq {since_seq}: {totals}")
+    return totals
+
+
+def export_changes_jsonl(db, table_name, output_path, since_seq=0, batch_size=10000):
+    """Grava em JSONL as alterações com sequência maior que 'since_seq'. Retorna a última sequência."""
+    source_id = db.get_site_id(table_name)
+    with open(output_path, "w", encoding="utf-8") as output_file:
+        while True:
+            columns, records = db.select_changes(table_name, since_seq, limit=batch_size)
+            for record in records:
+                change = dict(zip(columns, record))
+                change["source"] = source_id
+                output_file.write(json.dumps(change, ensure_ascii=False) + "\n")
+            if not records:
+                break
+            since_seq = records[-1][0]
+    return since_seq
+
+
+def apply_changes_jsonl(db, table_name, input_path, batch_size=10000):
+    """Aplica um arquivo JSONL gerado por export_changes_jsonl, em blocos, na ordem do arquivo."""
+    totals = {"applied": 0, "skipped": 0}
+    site_id = db.get_site_id(table_name)
+
+    def flush(batch):
+        if batch[0]["source"] == site_id:
+            raise ValueError(f"'{input_path}' foi exportado por um banco com o mesmo identificador de "
+                             f"'{db.db_name}' ({site_id}). Se um é cópia do outro, rode 'reset-site-id' na cópia.")
+        counts = db.apply_changes(table_name, batch, batch[0]["source"])
+        if counts is None:
+            raise sqlite3.Error(f"Falha ao aplicar as alterações de '{input_path}'.")
+        for key, value in counts.items():
+            totals[key] += value
+
+    batch = []
+    with open(input_path, encoding="utf-8") as input_file:
+        for line in input_file:
+            if not line.strip():
+                continue
+            change = json.loads(line)
+            if batch and (len(batch) >= batch_size or change["source"] != batch[0]["source"]):
+                flush(batch)
+                batch = []
+            batch.append(change)
+    if batch:
+        flush(batch)
+    return totals
+
+
+# --- Teste de carga com vários clientes simultâneos ---
+#Perfis de conexão comparados pelo teste de carga
+#('timeout' é o tempo máximo que cada comando espera por um lock antes de virar erro)
+STRESS_PROFILES = {
+    "padrao": {"timeout": 5.0, "journal_mode": None},
+    "wal": {"timeout": 5.0, "journal_mode": "WAL"},
+    "espera_curta": {"timeout": 0.5, "journal_mode": None},
+}
+
+#Proporção das operações de um operador típico do painel
+#('duplicate_add' e 'duplicate_rename' repetem um código existente e falham por unicidade)
+STRESS_OPERATION_MIX = {"add": 13, "update": 22, "duplicate_add": 3, "duplicate_rename": 2,
+                        "filter": 40, "search": 15, "list": 5}
+
+
+def _init_stress_logging(log_dir, profile_name):
+    """Inicializa cada processo do teste de carga com logs próprios em 'log_dir'.
+
+    O processo herdaria do pai um QueueHandler para uma fila que ninguém esvazia; aqui cada
+    um ganha sua fila e seus arquivos, fora do audit_log.jsonl de produção.
+    """
+    prefix = os.path.join(log_dir, f"{profile_name}_{os.getpid()}")
+    listener = setup_logging(error_log=f"{prefix}_errors.log", audit_log=f"{prefix}_audit.jsonl")
+    #processos do pool não executam atexit; o Finalize grava o que restar na fila ao sair
+    multiprocessing.util.Finalize(listener, listener.stop, exitpriority=10)
+
+
+def _stress_seed(db_name, journal_mode, seed_records):
+    """Cria o banco do teste com as tabelas e triggers do painel e 'seed_records' tickets."""
+    db = SQLiteDatabase(db_name, journal_mode=journal_mode)
+    db.create_table(TICKETS_TABLE, TICKETS_COLUMNS)
+    db.create_rollup_tables(TICKETS_TABLE)
+    db.create_change_log(TICKETS_TABLE)
+    db.upsert_records(TICKETS_TABLE, [{"name": f"INC{i:07d}", "type": "Outros", "date": "01/01/2025",
+                                       "status": "Pendente"} for i in range(seed_records)])
+    db.disconnect()
+
+
+def _stress_client(db_name, profile, client_index, duration_s, start_at, seed_records):
+    """Simula um operador do painel até 'duration_s' segundos. Executado em um processo próprio."""
+    metrics = {"ops": {}, "latencies": [], "errors": 0, "rejected": 0, "lock_stats": None}
+
+    #no painel estes erros virariam caixas de diálogo; aqui apenas são contados
+    #(códigos repetidos à parte, já que o mix os provoca de propósito)
+    def count_error(title, message):
+        metrics["rejected" if title == "Erro de Unicidade" else "errors"] += 1
+    global db_error_handler
+    db_error_handler = count_error
+
+    rng = random.Random(client_index)
+    operations = list(STRESS_OPERATION_MIX)
+    weights = list(STRESS_OPERATION_MIX.values())
+    status_options = ["Pendente", "Em atendimento", "Resolvido"]
+    type_options = ["Acessos", "Erros", "Impressoras", "Office365", "Outros"]
+
+    db = SQLiteDatabase(db_name, **profile)
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.time() + duration_s
+    sequence = 0
+    while time.time() < deadline:
+        operation = rng.choices(operations, weights)[0]
+        started = time.perf_counter()
+        if operation == "add":
+            sequence += 1
+            db.insert_record(TICKETS_TABLE, {"name": f"STRESS{client_index:03d}-{sequence:07d}",
+                                             "type": rng.choice(type_options),
+                                             "date": f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2025",
+                                             "status": status_options[0]})
+        elif operation == "update":
+            db.update_record(TICKETS_TABLE, rng.randint(1, seed_records), {"status": rng.choice(status_options)})
+        elif operation == "duplicate_add":
+            db.insert_record(TICKETS_TABLE, {"name": f"INC{rng.randrange(seed_records):07d}", "type": "Outros",
+                                             "date": "01/01/2025", "status": status_options[0]})
+        elif operation == "duplicate_rename":
+            record_id = rng.randint(1, seed_records)
+            db.update_record(TICKETS_TABLE, record_id, {"name": f"INC{record_id % seed_records:07d}"})
+        elif operation == "filter":
+            db.select_records_by_status(TICKETS_TABLE, rng.choice(status_options))
+        elif operation == "search":
+            db.select_records_by_name(TICKETS_TABLE, f"INC{rng.randint(0, seed_records):07d}")
+        else:
+            db.select_all_records(TICKETS_TABLE)
+        metrics["latencies"].append((operation, time.perf_counter() - started))
+        metrics["ops"][operation] = metrics["ops"].get(operation, 0) + 1
+    metrics["lock_stats"] = db.lock_stats
+    db.disconnect()
+    return metrics
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_stress_test(clients=4, duration_s=10, profiles=None, seed_records=5000, log_dir="stress_logs"):
+    """Mede quantos operadores simultâneos um arquivo SQLite suporta em cada perfil de conexão.
+
+    Para cada perfil cria um banco novo com 'seed_records' tickets (com as mesmas tabelas e
+    triggers do painel) e dispara 'clients' processos com o mix STRESS_OPERATION_MIX por
+    'duration_s' segundos. Retorna, por perfil, vazão, percentis de latência, novas
+    tentativas por lock, tempo total esperando locks (somado entre os clientes), gravações
+    rejeitadas por código repetido, outros erros que virariam caixas de diálogo e eventos
+    de auditoria gravados.
+    Todo o trabalho no banco roda nos processos do pool, que registram erros e auditoria em
+    uma subpasta de 'log_dir' criada para esta execução (retornada em 'log_dir').
+    """
+    results = {}
+    run_log_dir = os.path.join(log_dir, datetime.datetime.now().strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(run_log_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix="mahnrattan_stress_")
+    try:
+        for profile_name in (profiles or STRESS_PROFILES):
+            profile = STRESS_PROFILES[profile_name]
+            db_name = os.path.join(work_dir, f"{profile_name}.db")
+            with ProcessPoolExecutor(max_workers=clients, initializer=_init_stress_logging,
+                                     initargs=(run_log_dir, profile_name)) as pool:
+                pool.submit(_stress_seed, db_name, profile["journal_mode"], seed_records).result()
+                start_at = time.time() + 1.0
+                futures = [pool.submit(_stress_client, db_name, profile, index, duration_s, start_at, seed_records)
+                           for index in range(clients)]
+                client_metrics = [future.result() for future in futures]
+
+            audit_events = 0
+            for audit_file in Path(run_log_dir).glob(f"{profile_name}_*_audit.jsonl*"):
+                with open(audit_file, encoding="utf-8") as f:
+                    audit_events += sum(1 for _ in f)
+
+            latencies = sorted(latency for metrics in client_metrics for _, latency in metrics["latencies"])
+            total_ops = len(latencies)
+            results[profile_name] = {
+                "clients": clients,
+                "ops": total_ops,
+                "ops_per_s": total_ops / duration_s,
+                "p50_ms": _percentile(latencies, 0.50) * 1000,
+                "p95_ms": _percentile(latencies, 0.95) * 1000,
+                "p99_ms": _percentile(latencies, 0.99) * 1000,
+                "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+                "busy_retries": sum(metrics["lock_stats"]["busy_retries"] for metrics in client_metrics),
+                "locked_errors": sum(metrics["lock_stats"]["locked_errors"] for metrics in client_metrics),
+                "lock_wait_s": sum(metrics["lock_stats"]["lock_wait_s"] for metrics in client_metrics),
+                "rejected": sum(metrics["rejected"] for metrics in client_metrics),
+                "errors": sum(metrics["errors"] for metrics in client_metrics),
+                "audit_events": audit_events,
+                "log_dir": run_log_dir,
+            }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return results
+
+
 # --- Tkinter GUI Application ---
 class DatabasePanel:
-    def __init__(self, master, db_name="records_gui.db"):
+    def __init__(self, master, db_name="records_gui.db", reporting_mode=False, report_refresh_s=300):
         self.master = master
         master.title("Mahnrattan Database")
-        master.geometry("480x500")
+        master.geometry("480x530")
         master.resizable(False, False)
 
         #Tema escuro
@@ -275,15 +1540,30 @@ class DatabasePanel:
         self.monospace_font = ("TkFixedFont", 10)
 
         self.db = SQLiteDatabase(db_name)
-        self.table_name = "tickets"
-        self.table_columns = {
-            "id": "INTEGER PRIMARY KEY AUTOINCREMENT",
-            "name": "TEXT NOT NULL UNIQUE",
-            "type": "TEXT",
-            "date": "TEXT",
-            "status": "TEXT"
-        }
+        self.table_name = TICKETS_TABLE
+        self.table_columns = TICKETS_COLUMNS
         self.db.create_table(self.table_name, self.table_columns)
+        self.db.create_rollup_tables(self.table_name)
+        self.db.create_change_log(self.table_name)
+
+        #Modo relatório: os relatórios analíticos leem uma réplica somente leitura renovada
+        #periodicamente; as listagens após edições continuam lendo o banco ao vivo
+        self.report_db = self.db
+        self.report_refresh_ms = int(report_refresh_s * 1000)
+        if reporting_mode:
+            if report_refresh_s <= 0:
+                raise ValueError("O intervalo de atualização da réplica de relatórios deve ser maior que zero.")
+            snapshot_name = f"{os.path.splitext(db_name)[0]}_report.db"
+            self.report_db = ReportingDatabase(db_name, snapshot_name=snapshot_name, copy_now=False)
+            self._start_report_refresh()
+
+        #Busca enquanto digita no campo 'Ticket'
+        self.search_delay_ms = 200
+        self.search_limit = 10
+        self.search_worker = TicketSearchWorker(db_name, self.table_name, limit=self.search_limit)
+        self.search_results = []
+        self._search_after_id = None
+        self._search_poll_id = None
 
         self.type_options = [
             "Acessos", "Acompanhamento", "Agendamento", "CFTV", "Conexões",
@@ -298,6 +1578,7 @@ class DatabasePanel:
         self.status_combobox = None
         self.id_entry = None
         self.ticket_count_label = None
+        self.search_listbox = None
 
         self.create_widgets()
         self.update_ticket_count()
@@ -325,11 +1606,7 @@ class DatabasePanel:
 
     def _validate_date(self, date_string):
         """Valida se a string é uma data real no formato dd/mm/aaaa."""
-        try:
-            datetime.datetime.strptime(date_string, "%d/%m/%Y")
-            return True
-        except ValueError:
-            return False
+        return _parse_ticket_date(date_string) is not None
 
     def format_date_entry(self, event=None):
         """Formata o campo de data para dd/mm/aaaa."""
@@ -377,6 +1654,18 @@ class DatabasePanel:
                                    highlightbackground=self.highlight_color, highlightthickness=1, bd=0)
         self.name_entry.grid(row=0, column=1, pady=5, padx=5, sticky="ew")
         self.add_placeholder(self.name_entry, "Código do Ticket (INC123456)")
+        self.name_entry.bind("<KeyRelease>", self.on_name_key_release)
+        self.name_entry.bind("<Down>", self._focus_search_results)
+        self.name_entry.bind("<Escape>", lambda event: self._hide_search_results())
+
+        #Lista suspensa com as sugestões da busca por prefixo (exibida sob o campo 'Ticket')
+        self.search_listbox = tk.Listbox(input_frame, height=self.search_limit, bg=self.entry_bg, fg=self.entry_fg,
+                                         font=self.default_font, selectbackground=self.highlight_color,
+                                         selectforeground=self.entry_fg, activestyle="none",
+                                         highlightbackground=self.highlight_color, highlightthickness=1, bd=0)
+        self.search_listbox.bind("<ButtonRelease-1>", self._select_search_result)
+        self.search_listbox.bind("<Return>", self._select_search_result)
+        self.search_listbox.bind("<Escape>", lambda event: self._hide_search_results())
 
         tk.Label(input_frame, text="Tipo:", bg=self.bg_color, fg=self.fg_color, font=self.bold_font) \
             .grid(row=1, column=0, sticky="w", pady=5, padx=5)
@@ -453,6 +1742,7 @@ class DatabasePanel:
         centralized_buttons_frame.grid_rowconfigure(0, weight=1)
         centralized_buttons_frame.grid_rowconfigure(1, weight=1)
         centralized_buttons_frame.grid_rowconfigure(2, weight=1)
+        centralized_buttons_frame.grid_rowconfigure(3, weight=1)
 
         centralized_buttons_data = [
             ("Filtrar por Data", self.filter_records_by_date),
@@ -460,20 +1750,22 @@ class DatabasePanel:
             ("Filtrar por Status", self.filter_records_by_status),
             ("Limpar Registros", self.clear_all_records_prompt),
             ("Filtrar por Tipo", self.filter_records_by_type),
-            ("Ajuda", self.show_help_message)           
+            ("Ajuda", self.show_help_message),
+            ("Relatórios", self.show_reports)
             
         ]
 
-        button_positions = [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)] 
+        #(linha, coluna, colunas ocupadas)
+        button_positions = [(0, 0, 1), (0, 1, 1), (1, 0, 1), (1, 1, 1), (2, 0, 1), (2, 1, 1), (3, 0, 2)]
 
         for i, (text, command) in enumerate(centralized_buttons_data):
-            row, col = button_positions[i]
+            row, col, span = button_positions[i]
             tk.Button(centralized_buttons_frame, text=text, command=command,
                       bg=self.button_bg, fg=self.button_fg, font=self.default_font,
                       activebackground=self.highlight_color, activeforeground=self.entry_fg,
                       bd=0, highlightbackground=self.highlight_color, highlightthickness=1,
                       relief="flat", cursor="hand2") \
-                .grid(row=row, column=col, padx=5, pady=2, sticky="ew")
+                .grid(row=row, column=col, columnspan=span, padx=5, pady=2, sticky="ew")
 
         #Área de exibição de saída
         output_header_frame = tk.Frame(self.master, bg=self.bg_color)
@@ -507,6 +1799,131 @@ class DatabasePanel:
         count = self.db.count_total_records(self.table_name)
         self.ticket_count_label.config(text=f"Total: {count}")
 
+    def on_name_key_release(self, event):
+        """Agenda a busca por prefixo (com debounce) a cada tecla digitada no campo 'Ticket'."""
+        if event.keysym in ("Down", "Up", "Return", "Escape", "Tab"):
+            return
+        if self._search_after_id:
+            self.master.after_cancel(self._search_after_id)
+        self._search_after_id = self.master.after(self.search_delay_ms, self._start_name_search)
+
+    def _start_name_search(self):
+        """Dispara a busca pelo texto atual do campo 'Ticket', cancelando a anterior."""
+        self._search_after_id = None
+        prefix = self.name_entry.get().strip()
+        if not prefix or self.name_entry.cget('fg') == self.placeholder_fg:
+            self.search_worker.cancel()
+            self._hide_search_results()
+            return
+        self.search_worker.search(prefix)
+        if not self._search_poll_id:
+            self._poll_search_results()
+
+    def _poll_search_results(self):
+        """Verifica periodicamente se a thread de busca entregou o resultado da busca mais recente."""
+        self._search_poll_id = None
+        latest = None
+        try:
+            while True:
+                latest = self.search_worker.results.get_nowait()
+        except queue.Empty:
+            pass
+        if latest and latest[0] == self.search_worker.generation:
+            self.search_worker.pending = False
+            self._show_search_results(latest[1], latest[2])
+        elif self.search_worker.pending:
+            self._search_poll_id = self.master.after(20, self._poll_search_results)
+
+    def _show_search_results(self, columns, records):
+        """Preenche e exibe a lista suspensa com as sugestões encontradas."""
+        self.search_results = [dict(zip(columns, record)) for record in records]
+        if not self.search_results:
+            self._hide_search_results()
+            return
+        self.search_listbox.delete(0, tk.END)
+        for record in self.search_results:
+            self.search_listbox.insert(tk.END, f"{record['name']}  ({record['status']})")
+        self.search_listbox.config(height=len(self.search_results))
+        self.search_listbox.place(in_=self.name_entry, x=0, rely=1, relwidth=1)
+        self.search_listbox.lift()
+
+    def _hide_search_results(self):
+        """Oculta a lista suspensa de sugestões."""
+        self.search_results = []
+        if self.search_listbox:
+            self.search_listbox.place_forget()
+
+    def _focus_search_results(self, event=None):
+        """Move o foco para a lista de sugestões (seta para baixo no campo 'Ticket')."""
+        if self.search_results:
+            self.search_listbox.focus_set()
+            self.search_listbox.selection_clear(0, tk.END)
+            self.search_listbox.selection_set(0)
+            self.search_listbox.activate(0)
+        return "break"
+
+    def _select_search_result(self, event=None):
+        """Carrega nos campos o ticket escolhido na lista de sugestões."""
+        selection = self.search_listbox.curselection()
+        if not selection or selection[0] >= len(self.search_results):
+            return
+        record = self.search_results[selection[0]]
+        #preenche antes de exibir: o preenchimento limpa a área de saída (clear_entries)
+        self._fill_entries_from_record(record)
+        columns = list(record.keys())
+        self._display_records_in_output(columns, [tuple(record.values())], f"Ticket '{record['name']}'")
+        self.output_label.config(text=f"Ticket '{record['name']}':")
+        self.name_entry.focus_set()
+        self.name_entry.icursor(tk.END)
+
+    def _fill_entries_from_record(self, record_dict):
+        """Preenche os campos de entrada com os dados de um registro."""
+        self.clear_entries()
+
+        self.id_entry.delete(0, tk.END)
+        self.id_entry.insert(0, str(record_dict["id"]))
+        self.id_entry.config(fg=self.entry_fg)
+
+        self.name_entry.delete(0, tk.END)
+        self.name_entry.insert(0, record_dict["name"])
+        self.name_entry.config(fg=self.entry_fg)
+
+        self.type_combobox.set(record_dict["type"])
+        self.date_entry.delete(0, tk.END)
+        self.date_entry.insert(0, record_dict["date"])
+        if record_dict["date"]: self.date_entry.config(fg=self.entry_fg)
+        self.status_combobox.set(record_dict["status"])
+
+    def _start_report_refresh(self):
+        """Copia a réplica de relatórios em uma thread, para não travar a interface durante a cópia."""
+        result = {"copied_at": None}
+
+        def copy_snapshot():
+            try:
+                result["copied_at"] = self.report_db.copy_snapshot_to_temp()
+            except (sqlite3.Error, OSError) as e:
+                logging.error(f"Erro ao atualizar a réplica de relatórios '{self.report_db.snapshot_name}': {e}")
+
+        copy_thread = threading.Thread(target=copy_snapshot, daemon=True)
+        copy_thread.start()
+        self._poll_report_refresh(copy_thread, result)
+
+    def _poll_report_refresh(self, copy_thread, result):
+        """Troca a conexão para a nova cópia quando ela termina e agenda a próxima renovação."""
+        if copy_thread.is_alive():
+            self.master.after(200, lambda: self._poll_report_refresh(copy_thread, result))
+            return
+        if result["copied_at"] is not None:
+            self.report_db.swap_snapshot(result["copied_at"])
+        self.master.after(self.report_refresh_ms, self._start_report_refresh)
+
+    def _replica_note(self):
+        """Texto que indica a atualização da réplica nos títulos dos relatórios (vazio sem réplica)."""
+        if self.report_db is self.db or self.report_db.refreshed_at is None:
+            return ""
+        refreshed_at = datetime.datetime.fromtimestamp(self.report_db.refreshed_at).strftime("%H:%M:%S")
+        return f" (réplica de {refreshed_at}, há {int(self.report_db.replica_age() // 60)} min)"
+
     def display_message(self, message, append=False):
         """Exibe uma mensagem na área de texto de saída."""
         if not append:
@@ -527,6 +1944,7 @@ class DatabasePanel:
 
         self.type_combobox.set(self.type_options[0])
         self.status_combobox.set(self.status_options[0])
+        self._hide_search_results()
 
         self.display_message("Campos de entrada limpos.")
         self.output_label.config(text="Tickets:") # Resetar o label
@@ -658,25 +2076,10 @@ class DatabasePanel:
 
         columns, records = self.db.select_records_by_name(self.table_name, name_query)
         if records:
+            first_record_dict = dict(zip(columns, records[0]))
+            self._fill_entries_from_record(first_record_dict)
             self._display_records_in_output(columns, records, f"Tickets encontrados com '{name_query}'")
             self.output_label.config(text=f"Tickets encontrados com '{name_query}':") # Atualiza o label superior
-            first_record_dict = dict(zip(columns, records[0]))
-            
-            self.clear_entries()
-            
-            self.id_entry.delete(0, tk.END)
-            self.id_entry.insert(0, str(first_record_dict["id"]))
-            self.id_entry.config(fg=self.entry_fg)
-
-            self.name_entry.delete(0, tk.END)
-            self.name_entry.insert(0, first_record_dict["name"])
-            self.name_entry.config(fg=self.entry_fg)
-
-            self.type_combobox.set(first_record_dict["type"])
-            self.date_entry.delete(0, tk.END)
-            self.date_entry.insert(0, first_record_dict["date"])
-            if first_record_dict["date"]: self.date_entry.config(fg=self.entry_fg)
-            self.status_combobox.set(first_record_dict["status"])
         else:
             self.display_message(f"Nenhum ticket encontrado com o código '{name_query}'.")
             self.output_label.config(text=f"Nenhum ticket encontrado com '{name_query}':") # Atualiza o label superior
@@ -742,7 +2145,7 @@ class DatabasePanel:
     def _display_records_in_output(self, columns, records, title):
         """Função auxiliar para formatar e exibir registros na área de saída."""
         self.output_text.delete(1.0, tk.END)
-        print(f"DEBUG (_display_records_in_output): Received {len(records)} records for display under title: '{title}'")
+        logging.debug(f"_display_records_in_output: Received {len(records)} records for display under title: '{title}'")
         
         self.output_text.insert(tk.END, f"{title}\n\n")
 
@@ -752,7 +2155,8 @@ class DatabasePanel:
             self.output_text.see(tk.END)
             return
         
-        display_name_map = {"id": "ID", "name": "Ticket", "type": "Tipo", "date": "Data", "status": "Status"}
+        display_name_map = {"id": "ID", "name": "Ticket", "type": "Tipo", "date": "Data", "status": "Status",
+                            "day": "Dia", "count": "Qtd"}
         
         display_columns_for_width = [len(display_name_map.get(col, col)) for col in columns]
 
@@ -783,6 +2187,22 @@ class DatabasePanel:
         self.output_text.insert(tk.END, f"\n--- Exibindo {len(records)} registro(s) ---\n")
         self.output_text.see(tk.END)
 
+    def show_reports(self):
+        """Exibe o resumo diário por tipo/status e o tempo médio em cada status."""
+        if self.report_db.conn is None:
+            self.display_message("A réplica de relatórios ainda está sendo preparada. Tente novamente em instantes.")
+            return
+        columns, records = self.report_db.select_daily_rollup(self.table_name)
+        self._display_records_in_output(columns, records, f"Resumo Diário por Tipo e Status{self._replica_note()}")
+        self.output_label.config(text="Relatórios:")
+
+        columns, records = self.report_db.select_time_in_status(self.table_name)
+        self.display_message("\nTempo em cada status (horas):", append=True)
+        for status, avg_hours, transitions, current in records:
+            avg_text = f"{avg_hours:.2f} h" if avg_hours is not None else "-"
+            self.display_message(f"  {status or '(vazio)'}: média {avg_text} em {transitions} passagem(ns), "
+                                 f"{current} ticket(s) no status agora", append=True)
+
     def clear_all_records_prompt(self):
         """Solicita confirmação e deleta todos os registros do banco de dados."""
         if messagebox.askyesno("Confirmar Exclusão", "Você tem certeza que deseja excluir TODOS os tickets? Esta ação é irreversível!"):
@@ -800,7 +2220,8 @@ class DatabasePanel:
         help_text = (
             "--- GUIA DE USO ---\n\n"
             "• Ticket: Código de identificação do ticket (deve ser único).\n"
-            "  Ex: INC123456, INC654321\n\n"
+            "  Ex: INC123456, INC654321\n"
+            "  Ao digitar, os tickets que começam com o texto aparecem em uma lista (↓ e Enter para escolher).\n\n"
             "• Tipo: Categoria do serviço ou problema. Escolha da lista.\n"
             f"  Valores: {type_options_str}\n\n"
             "• Data: Data do registro ou ocorrência. Formato dd/mm/aaaa.\n"
@@ -820,13 +2241,127 @@ class DatabasePanel:
             "• Filtrar por Status: Exibe apenas os tickets que correspondem ao status selecionado no campo 'Status:', ordenados pela data mais recente.\n"
             "• Limpar Campos: Limpa todos os campos de entrada.\n"
             "• Limpar Registros: Exclui permanentemente TODOS os tickets do banco de dados.\n"
+            "• Relatórios: Exibe a quantidade de tickets por dia, tipo e status e o tempo médio em cada status.\n"
         )
         messagebox.showinfo("Ajuda Mahnrattan Control", help_text)
 
 
-#Início do Aplicativo Principal
-if __name__ == "__main__":
+def main(argv=None):
+    """Abre o painel ou executa um comando de linha de comando."""
+    parser = argparse.ArgumentParser(description="Mahnrattan Database")
+    parser.add_argument("--db", default="records_gui.db", help="Arquivo do banco de dados SQLite.")
+    parser.add_argument("--debug", action="store_true", help="Exibe as mensagens de depuração no console.")
+    parser.add_argument("--reporting", action="store_true",
+                        help="Os relatórios leem uma réplica somente leitura do banco, renovada periodicamente.")
+    parser.add_argument("--report-refresh", type=int, default=300,
+                        help="Intervalo, em segundos, de atualização da réplica de relatórios.")
+    subparsers = parser.add_subparsers(dest="command")
+
+    ingest_parser = subparsers.add_parser("ingest", help="Importa arquivos CSV/JSONL de tickets em paralelo.")
+    ingest_parser.add_argument("files", nargs="+", help="Arquivos .csv ou .jsonl (um ou mais shards).")
+    ingest_parser.add_argument("--workers", type=int, default=None, help="Processos de validação (padrão: núcleos).")
+    ingest_parser.add_argument("--batch-size", type=int, default=5000, help="Linhas por bloco.")
+    ingest_parser.add_argument("--policy", choices=UPSERT_POLICIES, default="overwrite",
+                               help="Política para códigos de ticket já existentes.")
+
+    sync_parser = subparsers.add_parser("sync", help="Envia a outro banco as alterações ainda não aplicadas nele.")
+    sync_parser.add_argument("target", help="Arquivo do banco de destino.")
+
+    export_parser = subparsers.add_parser("export-changes", help="Exporta o registro de alterações em JSONL.")
+    export_parser.add_argument("output", help="Arquivo .jsonl de saída.")
+    export_parser.add_argument("--since", type=int, default=0, help="Exporta apenas sequências maiores que esta.")
+
+    apply_parser = subparsers.add_parser("apply-changes", help="Aplica um JSONL gerado por export-changes.")
+    apply_parser.add_argument("input", help="Arquivo .jsonl de entrada.")
+
+    subparsers.add_parser("reset-site-id", help="Gera um novo identificador para um banco copiado de outro.",
+                          description="Um banco criado copiando o arquivo de outro herda o identificador dele e "
+                                      "não pode ser sincronizado com o original. Rode este comando na cópia "
+                                      "(--db) uma vez; o que já foi editado nela é preservado.")
+
+    stress_parser = subparsers.add_parser("stress", help="Teste de carga com vários operadores simultâneos.")
+    stress_parser.add_argument("--clients", type=int, default=4, help="Quantidade de processos simultâneos.")
+    stress_parser.add_argument("--duration", type=float, default=10, help="Duração de cada perfil, em segundos.")
+    stress_parser.add_argument("--profiles", nargs="+", choices=list(STRESS_PROFILES), default=None,
+                               help="Perfis de conexão a comparar (padrão: todos).")
+    stress_parser.add_argument("--seed-records", type=int, default=5000, help="Tickets criados antes do teste.")
+    stress_parser.add_argument("--log-dir", default="stress_logs", help="Pasta dos logs dos processos do teste.")
+
+    args = parser.parse_args(argv)
+    if args.report_refresh <= 0:
+        parser.error("--report-refresh deve ser maior que zero.")
+    setup_logging(debug=args.debug)
+
+    if args.command:
+        #sem painel não há caixa de diálogo: erros do banco encerram o comando com a mensagem
+        global db_error_handler
+        db_error_handler = _raise_database_error
+        try:
+            _run_command(args)
+        except (DatabaseError, sqlite3.Error, ValueError) as e:
+            parser.exit(1, f"Erro: {e}\n")
+        return
+
     root = tk.Tk()
-    app = DatabasePanel(root, db_name="records_gui.db")
+    app = DatabasePanel(root, db_name=args.db, reporting_mode=args.reporting, report_refresh_s=args.report_refresh)
     root.mainloop()
 
+
+def _run_command(args):
+    """Executa um dos comandos de linha de comando (ingest, sync, export-changes, apply-changes,
+    reset-site-id, stress)."""
+    if args.command == "stress":
+        results = run_stress_test(clients=args.clients, duration_s=args.duration,
+                                  profiles=args.profiles, seed_records=args.seed_records, log_dir=args.log_dir)
+        print(f"{'Perfil':<12}{'Ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'máx ms':>9}"
+              f"{'Retries':>9}{'Espera s':>10}{'Locked':>8}{'Rejeit.':>9}{'Erros':>7}{'Auditoria':>11}")
+        for profile_name, result in results.items():
+            print(f"{profile_name:<12}{result['ops_per_s']:>9.1f}{result['p50_ms']:>9.2f}{result['p95_ms']:>9.2f}"
+                  f"{result['p99_ms']:>9.2f}{result['max_ms']:>9.1f}{result['busy_retries']:>9}"
+                  f"{result['lock_wait_s']:>10.2f}{result['locked_errors']:>8}{result['rejected']:>9}{result['errors']:>7}"
+                  f"{result['audit_events']:>11}")
+        if results:
+            print(f"Logs dos processos em: {next(iter(results.values()))['log_dir']}")
+        return
+
+    if args.command in ("sync", "export-changes", "apply-changes", "reset-site-id"):
+        db = SQLiteDatabase(args.db)
+        db.create_table(TICKETS_TABLE, TICKETS_COLUMNS)
+        db.create_rollup_tables(TICKETS_TABLE)
+        db.create_change_log(TICKETS_TABLE)
+        if args.command == "sync":
+            target_db = SQLiteDatabase(args.target)
+            target_db.create_table(TICKETS_TABLE, TICKETS_COLUMNS)
+            target_db.create_rollup_tables(TICKETS_TABLE)
+            target_db.create_change_log(TICKETS_TABLE)
+            totals = sync_databases(db, target_db, TICKETS_TABLE)
+            target_db.disconnect()
+            print(f"Alterações aplicadas: {totals['applied']}, ignoradas: {totals['skipped']}")
+        elif args.command == "reset-site-id":
+            print(f"Novo identificador do banco: {db.reset_site_id(TICKETS_TABLE)}")
+        elif args.command == "export-changes":
+            last_seq = export_changes_jsonl(db, TICKETS_TABLE, args.output, since_seq=args.since)
+            print(f"Alterações exportadas até a sequência {last_seq}.")
+        else:
+            totals = apply_changes_jsonl(db, TICKETS_TABLE, args.input)
+            print(f"Alterações aplicadas: {totals['applied']}, ignoradas: {totals['skipped']}")
+        db.disconnect()
+        return
+
+    if args.command == "ingest":
+        db = SQLiteDatabase(args.db)
+        db.create_table(TICKETS_TABLE, TICKETS_COLUMNS)
+        db.create_rollup_tables(TICKETS_TABLE)
+        db.create_change_log(TICKETS_TABLE)
+        totals = ingest_files(db, TICKETS_TABLE, args.files, workers=args.workers,
+                              batch_size=args.batch_size, conflict_policy=args.policy)
+        db.disconnect()
+        print(f"Inseridos: {totals['inserted']}, atualizados: {totals['updated']}, "
+              f"ignorados: {totals['skipped']}, rejeitados: {totals['rejected']}")
+
+
+#Início do Aplicativo Principal
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
+